@@ -1,15 +1,39 @@
 """
 Job Scraper for Discord Notifications
 Scrapes RemoteOK for entry/associate automation & operations roles
-Sends individual notifications to Discord via webhook
+Sends batched notifications to Discord via webhook
 Runs automatically via GitHub Actions every 2 hours
 """
 
 import requests
 import json
 import os
-from datetime import datetime, timedelta
+import re
+import sys
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+from itertools import islice
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: fall back to compiled regular expressions
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the standard library json module
+    orjson = None
+
+try:
+    import ijson
+    JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:  # Optional: fall back to parsing the whole response at once
+    ijson = None
+    JSON_ERRORS = (json.JSONDecodeError,)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -39,38 +63,115 @@ EXCLUDE_KEYWORDS = [
 # Requirements (RemoteOK is remote-only by default)
 MUST_BE_REMOTE = False
 
-# File to track jobs already sent (prevents duplicates)
-SENT_JOBS_FILE = 'sent_jobs.json'
+# Maximum number of jobs to send per run
+MAX_JOBS_PER_RUN = 5
+
+# Discord accepts at most 10 embeds per webhook message
+DISCORD_MAX_EMBEDS = 10
+
+# Attempts per webhook message when Discord rate limits us
+DISCORD_MAX_ATTEMPTS = 3
+
+# File to track jobs already sent (prevents duplicates), one JSON object per line
+SENT_JOBS_FILE = 'sent_jobs.jsonl'
+
+# Previous single-document format, migrated automatically on first run
+LEGACY_SENT_JOBS_FILE = 'sent_jobs.json'
+
+# Number of most recently sent job IDs to remember
+SENT_JOBS_LIMIT = 1000
+
+# File holding the RemoteOK ETag/Last-Modified values for conditional requests
+FEED_CACHE_FILE = 'etag.json'
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+# Log lines are buffered and written to stdout in one go at the end of a run
+_LOG_LINES = []
+
+def log(message=""):
+    """Buffer a log line instead of printing it straight away"""
+    _LOG_LINES.append(message)
+
+def flush_log():
+    """Write all buffered log lines to stdout with a single write"""
+    if _LOG_LINES:
+        sys.stdout.write("\n".join(_LOG_LINES) + "\n")
+        sys.stdout.flush()
+        _LOG_LINES.clear()
+
+# ============================================================================
+# HTTP SESSION
+# ============================================================================
+
+def create_session():
+    """
+    Build a shared HTTP session so RemoteOK and Discord requests reuse
+    keep-alive connections instead of doing a new TLS handshake each time
+    """
+    session = requests.Session()
+    # Retries only apply to idempotent requests (the RemoteOK GET); webhook
+    # POSTs are only retried on a 429 by send_embeds, so they can't duplicate
+    retries = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=retries)
+    session.mount('https://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+SESSION = create_session()
+
+# ============================================================================
+# JSON HELPERS
+# ============================================================================
+
+def json_loads(data):
+    """Parse JSON text or bytes, using orjson when it's installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(data, indent=True):
+    """Serialize data to JSON text, using orjson when it's installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None).decode()
+    return json.dumps(data, indent=2 if indent else None)
 
 # ============================================================================
 # TIME-BASED FILTERING
 # ============================================================================
 
-def is_job_fresh(job, hours=JOB_FRESHNESS_HOURS):
+def get_cutoff_epoch(now, hours=JOB_FRESHNESS_HOURS):
+    """Return the epoch timestamp before which jobs are considered old"""
+    return now - hours * 3600
+
+def is_job_fresh(job, cutoff_epoch):
     """
-    Check if a job was posted within the specified time window
+    Check if a job was posted after the cutoff (computed once per run)
     This prevents sending old jobs as "new" notifications
     """
     try:
         # RemoteOK uses epoch timestamp
         job_epoch = job.get('epoch', 0)
         if job_epoch == 0:
-            print(f"⚠️ Job {job.get('id', 'unknown')} has no timestamp, skipping")
+            log(f"⚠️ Job {job.get('id', 'unknown')} has no timestamp, skipping")
             return False
             
-        job_time = datetime.fromtimestamp(job_epoch)
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        is_fresh = job_time >= cutoff_time
+        is_fresh = job_epoch >= cutoff_epoch
         
         if not is_fresh:
-            hours_old = (datetime.now() - job_time).total_seconds() / 3600
-            print(f"⏰ Skipping old job: {job.get('position', 'Unknown')} ({hours_old:.1f}h old)")
+            hours_old = (time.time() - job_epoch) / 3600
+            log(f"⏰ Skipping old job: {job.get('position', 'Unknown')} ({hours_old:.1f}h old)")
             
         return is_fresh
         
     except Exception as e:
-        print(f"❌ Error checking job timestamp: {e}")
+        log(f"❌ Error checking job timestamp: {e}")
         # If we can't determine age, assume it's fresh to avoid missing jobs
         return True
 
@@ -78,129 +179,326 @@ def is_job_fresh(job, hours=JOB_FRESHNESS_HOURS):
 # DUPLICATE TRACKING WITH CLEANUP
 # ============================================================================
 
+def write_file_atomically(path, text):
+    """
+    Write text to a temp file and rename it over path, so a run killed
+    mid-write leaves either the old file or the new one, never a partial file
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# In-memory copy of the sent jobs file, loaded once per run
+_SENT_CACHE = None
+
+def remember_sent_job(job_id, sent_at):
+    """Track a job ID in memory, evicting the oldest once SENT_JOBS_LIMIT is reached"""
+    jobs, ids = _SENT_CACHE['jobs'], _SENT_CACHE['ids']
+    if job_id in ids:
+        return False
+    if len(jobs) == jobs.maxlen:
+        ids.discard(jobs[0][0])  # Appending will push this one out of the deque
+    jobs.append((job_id, sent_at))
+    ids.add(job_id)
+    return True
+
 def load_sent_jobs():
-    """Load the list of job IDs we've already sent to Discord"""
+    """Load the set of job IDs we've already sent to Discord (cached after first read)"""
+    global _SENT_CACHE
+    if _SENT_CACHE is not None:
+        return _SENT_CACHE['ids']
+    
+    # Keep IDs in the order they were sent (for eviction) plus a set for fast lookups
+    _SENT_CACHE = {
+        'jobs': deque(maxlen=SENT_JOBS_LIMIT),
+        'ids': set(),
+        'pending': [],  # Sent this run, not yet appended to the file
+        'compact': False  # Rewrite the whole file on flush
+    }
+    
     if os.path.exists(SENT_JOBS_FILE):
+        line_count = 0
         try:
-            with open(SENT_JOBS_FILE, 'r') as f:
-                data = json.load(f)
-                # Handle both old format (list) and new format (dict with timestamps)
-                if isinstance(data, list):
-                    return {'jobs': data, 'last_cleanup': 0}
-                return data
+            with open(SENT_JOBS_FILE, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    line_count += 1
+                    try:
+                        entry = json_loads(line)
+                        remember_sent_job(entry['id'], entry.get('ts', 0))
+                    except Exception:
+                        # A run killed mid-append can leave a partial line; rewrite the file
+                        log("⚠️ Skipping unreadable line in sent jobs file")
+                        _SENT_CACHE['compact'] = True
         except Exception as e:
-            print(f"⚠️ Error loading sent jobs file: {e}")
-            return {'jobs': [], 'last_cleanup': 0}
-    return {'jobs': [], 'last_cleanup': 0}
-
-def save_sent_job(job_id):
-    """Add a job ID to the sent list with timestamp tracking"""
-    data = load_sent_jobs()
-    if job_id not in data['jobs']:
-        data['jobs'].append(job_id)
-        
-        # Clean up old entries weekly
-        current_time = datetime.now().timestamp()
-        if current_time - data.get('last_cleanup', 0) > 604800:  # 7 days
-            # Keep only last 1000 job IDs
-            data['jobs'] = data['jobs'][-1000:]
-            data['last_cleanup'] = current_time
-            print("🧹 Cleaned up old job tracking data")
+            log(f"⚠️ Error loading sent jobs file: {e}")
         
+        # Compact once the log holds far more entries than we remember
+        if line_count > 2 * SENT_JOBS_LIMIT:
+            _SENT_CACHE['compact'] = True
+    
+    elif os.path.exists(LEGACY_SENT_JOBS_FILE):
         try:
-            with open(SENT_JOBS_FILE, 'w') as f:
-                json.dump(data, f, indent=2)
+            with open(LEGACY_SENT_JOBS_FILE, 'rb') as f:
+                data = json_loads(f.read())
+                # Handle both old format (list) and dict format (with cleanup timestamp)
+                job_ids = data if isinstance(data, list) else data.get('jobs', [])
+            for job_id in job_ids:
+                remember_sent_job(job_id, 0)
+            # Migrate to the JSON Lines file on the next flush
+            _SENT_CACHE['compact'] = True
         except Exception as e:
-            print(f"❌ Error saving sent jobs: {e}")
+            log(f"⚠️ Error loading legacy sent jobs file: {e}")
+    
+    return _SENT_CACHE['ids']
+
+def save_sent_job(job_id):
+    """Add a job ID to the sent list (written to disk by flush_sent_jobs)"""
+    load_sent_jobs()
+    sent_at = int(time.time())
+    if remember_sent_job(job_id, sent_at):
+        _SENT_CACHE['pending'].append((job_id, sent_at))
+
+def flush_sent_jobs():
+    """Append this run's sent job IDs to disk in one write, compacting the file if needed"""
+    if _SENT_CACHE is None:
+        return
+    
+    if _SENT_CACHE['compact']:
+        # Rewrite with only the IDs we still remember, oldest first
+        entries = _SENT_CACHE['jobs']
+    elif _SENT_CACHE['pending']:
+        entries = _SENT_CACHE['pending']
+    else:
+        return
+    
+    lines = ''.join(
+        json_dumps({'id': job_id, 'ts': sent_at}, indent=False) + '\n'
+        for job_id, sent_at in entries
+    )
+    try:
+        if _SENT_CACHE['compact']:
+            write_file_atomically(SENT_JOBS_FILE, lines)
+            log("🧹 Cleaned up old job tracking data")
+        else:
+            # A partial append is skipped (and compacted away) by the next load
+            with open(SENT_JOBS_FILE, 'a') as f:
+                f.write(lines)
+        _SENT_CACHE['pending'] = []
+        _SENT_CACHE['compact'] = False
+    except Exception as e:
+        log(f"❌ Error saving sent jobs: {e}")
 
 def is_already_sent(job_id):
     """Check if we've already sent this job"""
-    data = load_sent_jobs()
-    return job_id in data['jobs']
+    return job_id in load_sent_jobs()
 
 # ============================================================================
 # JOB SCRAPING
 # ============================================================================
 
+# ETag/Last-Modified of the feed, set only once it has been read to the end
+_FEED_VALIDATORS = None
+
+def load_feed_validators():
+    """Load the ETag/Last-Modified values saved by the last complete run"""
+    if not os.path.exists(FEED_CACHE_FILE):
+        return {}
+    try:
+        with open(FEED_CACHE_FILE, 'rb') as f:
+            data = json_loads(f.read())
+            return data if isinstance(data, dict) else {}
+    except Exception as e:
+        log(f"⚠️ Error loading feed cache file: {e}")
+        return {}
+
+def save_feed_validators():
+    """Save this run's feed validators so the next run can skip an unchanged feed"""
+    if not _FEED_VALIDATORS:
+        return
+    try:
+        write_file_atomically(FEED_CACHE_FILE, json_dumps(_FEED_VALIDATORS))
+    except Exception as e:
+        log(f"❌ Error saving feed cache: {e}")
+
 def fetch_remoteok_jobs():
-    """Fetch recent jobs from RemoteOK API with improved error handling"""
+    """
+    Stream recent jobs from RemoteOK API with improved error handling
+    Jobs are yielded one at a time; errors are reported and end the stream
+    """
+    global _FEED_VALIDATORS
     url = "https://remoteok.com/api"
     
     try:
         # RemoteOK requires a user agent
         headers = {
             'User-Agent': 'Mozilla/5.0 (compatible; JobScraperBot/1.0)',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            # The JSON feed compresses well; requests decodes gzip/deflate for us
+            'Accept-Encoding': 'gzip, deflate'
         }
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
         
-        # First item is metadata, skip it
-        data = response.json()
-        if not isinstance(data, list) or len(data) == 0:
-            print("❌ Invalid response format from RemoteOK")
-            return []
-            
-        jobs = data[1:]  # Skip metadata
+        # Ask for the feed only if it changed since the last complete run
+        validators = load_feed_validators()
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
         
-        print(f"✅ Fetched {len(jobs)} total jobs from RemoteOK")
-        return jobs
+        # With ijson the body is parsed as it downloads instead of all at once
+        response = SESSION.get(url, headers=headers, timeout=15, stream=ijson is not None)
+        with response:
+            if response.status_code == 304:
+                log("✅ No changes on RemoteOK since the last run")
+                return
+            response.raise_for_status()
+            
+            if ijson is not None:
+                response.raw.decode_content = True  # Undo gzip/deflate while streaming
+                items = ijson.items(response.raw, 'item', use_float=True)
+            else:
+                data = json_loads(response.content)
+                items = iter(data if isinstance(data, list) else [])
+            
+            # First item is metadata, skip it
+            if next(items, None) is None:
+                log("❌ Invalid response format from RemoteOK")
+                return
+            
+            yield from items
+            
+            # Only remember the feed version once every job in it was seen
+            _FEED_VALIDATORS = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
         
     except requests.exceptions.Timeout:
-        print("❌ Timeout fetching jobs from RemoteOK")
-        return []
+        log("❌ Timeout fetching jobs from RemoteOK")
     except requests.exceptions.RequestException as e:
-        print(f"❌ Network error fetching jobs: {e}")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON response: {e}")
-        return []
+        log(f"❌ Network error fetching jobs: {e}")
+    except JSON_ERRORS as e:
+        log(f"❌ Invalid JSON response: {e}")
     except Exception as e:
-        print(f"❌ Unexpected error fetching jobs: {e}")
-        return []
+        log(f"❌ Unexpected error fetching jobs: {e}")
 
 # ============================================================================
 # FILTERING LOGIC
 # ============================================================================
 
-def matches_criteria(job):
-    """Check if a job matches your search criteria with improved matching"""
+# Lowercase keywords once instead of for every job
+INCLUDE_KEYWORDS_LC = tuple(keyword.lower() for keyword in INCLUDE_KEYWORDS)
+EXCLUDE_KEYWORDS_LC = tuple(keyword.lower() for keyword in EXCLUDE_KEYWORDS)
+
+def build_keyword_automaton():
+    """Build one Aho-Corasick automaton holding every INCLUDE and EXCLUDE keyword"""
+    if ahocorasick is None or not (INCLUDE_KEYWORDS_LC or EXCLUDE_KEYWORDS_LC):
+        return None
     
-    # Get job details (case-insensitive search)
-    title = job.get('position', '').lower()
-    description = job.get('description', '').lower()
-    tags = [tag.lower() for tag in job.get('tags', [])]
-    company = job.get('company', '').lower()
+    automaton = ahocorasick.Automaton()
+    for keyword in INCLUDE_KEYWORDS_LC:
+        automaton.add_word(keyword, ('include', keyword))
+    # Added last so a keyword in both lists counts as an exclude
+    for keyword in EXCLUDE_KEYWORDS_LC:
+        automaton.add_word(keyword, ('exclude', keyword))
+    automaton.make_automaton()
+    return automaton
+
+KEYWORD_AUTOMATON = build_keyword_automaton()
+
+def compile_keyword_pattern(keywords):
+    """Compile keywords into one literal alternation (fallback when pyahocorasick is missing)"""
+    if not keywords:
+        return None  # An empty pattern would match every job
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+INCLUDE_PATTERN = compile_keyword_pattern(INCLUDE_KEYWORDS_LC)
+EXCLUDE_PATTERN = compile_keyword_pattern(EXCLUDE_KEYWORDS_LC)
+
+def scan_keywords(text):
+    """
+    Scan lowercased text for keywords in a single pass
+    Returns (has_include, has_exclude), stopping early once an EXCLUDE keyword is found
+    """
+    if KEYWORD_AUTOMATON is None:
+        if EXCLUDE_PATTERN is not None and EXCLUDE_PATTERN.search(text):
+            return False, True
+        return INCLUDE_PATTERN is not None and INCLUDE_PATTERN.search(text) is not None, False
     
-    # Combine all text for keyword searching
-    all_text = f"{title} {description} {' '.join(tags)} {company}"
+    has_include = False
+    for _, (category, _) in KEYWORD_AUTOMATON.iter(text):
+        if category == 'exclude':
+            return has_include, True
+        has_include = True
+    return has_include, False
+
+# Lowercased view of a job's short fields, built once per candidate job
+NormalizedJob = namedtuple('NormalizedJob', ['id', 'title', 'tags', 'company', 'raw'])
+
+def normalize_job(job):
+    """Extract and lowercase the fields the filters need, keeping the raw job for Discord"""
+    return NormalizedJob(
+        id=job.get('id'),
+        title=job.get('position', '').lower(),
+        tags=tuple(tag.lower() for tag in job.get('tags', [])),
+        company=job.get('company', '').lower(),
+        raw=job
+    )
+
+def matches_criteria_fast(job):
+    """
+    Check a normalized job's short fields (title, tags, company) only
+    Returns False if an EXCLUDE keyword rules it out, True if an INCLUDE keyword
+    was found, or None if the description still has to supply one
+    """
     
     # Check: Must be remote (disabled since RemoteOK is remote-only)
-    if MUST_BE_REMOTE and not job.get('remote', True):
+    if MUST_BE_REMOTE and not job.raw.get('remote', True):
         return False
     
-    # Check: Must have at least one INCLUDE keyword
-    has_include = any(keyword.lower() in all_text for keyword in INCLUDE_KEYWORDS)
-    if not has_include:
+    # Check: Must NOT have any EXCLUDE keywords - the title alone rejects most
+    # senior/manager roles, so scan it before building any other text
+    title_include, title_exclude = scan_keywords(job.title)
+    if title_exclude:
         return False
     
-    # Check: Must NOT have any EXCLUDE keywords
-    has_exclude = any(keyword.lower() in all_text for keyword in EXCLUDE_KEYWORDS)
-    if has_exclude:
+    # Then the other short fields
+    tags_include, tags_exclude = scan_keywords(f"{' '.join(job.tags)} {job.company}")
+    if tags_exclude:
         return False
     
-    return True
+    return True if title_include or tags_include else None
+
+def matches_criteria_full(job, has_include):
+    """Finish checking a job that passed matches_criteria_fast by scanning its description"""
+    
+    # The description is much longer, so only lowercase and scan it once we need it;
+    # it always has to be checked for EXCLUDE keywords, even if an INCLUDE was found
+    description = job.raw.get('description', '').lower()
+    description_include, description_exclude = scan_keywords(description)
+    if description_exclude:
+        return False
+    
+    # Check: Must have at least one INCLUDE keyword
+    return bool(has_include) or description_include
+
+def matches_criteria(job):
+    """Check if a normalized job matches your search criteria, cheapest checks first"""
+    fast_result = matches_criteria_fast(job)
+    if fast_result is False:
+        return False
+    return matches_criteria_full(job, fast_result)
 
 # ============================================================================
 # DISCORD NOTIFICATION
 # ============================================================================
 
-def send_to_discord(job):
-    """Send a job posting to Discord as a rich embed with better formatting"""
-    
-    if not WEBHOOK_URL:
-        print("❌ No Discord webhook URL configured")
-        return False
+def build_embed(job, now):
+    """Build a rich Discord embed for a job posting"""
     
     # Extract job details with better defaults
     title = job.get('position', 'Unknown Position')
@@ -213,12 +511,11 @@ def send_to_discord(job):
     
     # Format job age
     try:
-        job_time = datetime.fromtimestamp(job.get('epoch', 0))
-        time_ago = datetime.now() - job_time
-        if time_ago.total_seconds() < 3600:
-            age_text = f"{int(time_ago.total_seconds() / 60)}m ago"
+        seconds_ago = now - job.get('epoch', 0)
+        if seconds_ago < 3600:
+            age_text = f"{int(seconds_ago // 60)}m ago"
         else:
-            age_text = f"{int(time_ago.total_seconds() / 3600)}h ago"
+            age_text = f"{int(seconds_ago // 3600)}h ago"
     except:
         age_text = "Recently posted"
     
@@ -248,7 +545,7 @@ def send_to_discord(job):
         "footer": {
             "text": f"RemoteOK • Job ID: {job_id}"
         },
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.fromtimestamp(now).isoformat()
     }
     
     # Add tags field if we have tags
@@ -259,99 +556,146 @@ def send_to_discord(job):
             "inline": False
         })
     
+    return embed
+
+def send_embeds(embeds):
+    """Send a batch of embeds (up to DISCORD_MAX_EMBEDS) in a single webhook message"""
+    
+    if not WEBHOOK_URL:
+        log("❌ No Discord webhook URL configured")
+        return False
+    
     payload = {
-        "embeds": [embed]
+        "embeds": embeds[:DISCORD_MAX_EMBEDS]
     }
     
-    try:
-        response = requests.post(WEBHOOK_URL, json=payload, timeout=10)
-        response.raise_for_status()
-        print(f"✅ Sent to Discord: {title} at {company} ({age_text})")
-        return True
-        
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error sending to Discord: {e}")
-        return False
+    for attempt in range(1, DISCORD_MAX_ATTEMPTS + 1):
+        try:
+            response = SESSION.post(WEBHOOK_URL, json=payload, timeout=10)
+            
+            # Rate limited messages aren't delivered, so they're safe to retry
+            if response.status_code == 429 and attempt < DISCORD_MAX_ATTEMPTS:
+                retry_after = float(
+                    response.headers.get('X-RateLimit-Reset-After')
+                    or response.headers.get('Retry-After')
+                    or 1
+                )
+                log(f"⏳ Rate limited by Discord, retrying in {retry_after:.1f}s")
+                time.sleep(retry_after)
+                continue
+            
+            response.raise_for_status()
+            return True
+            
+        except requests.exceptions.RequestException as e:
+            log(f"❌ Error sending to Discord: {e}")
+            return False
+        except ValueError as e:
+            log(f"❌ Invalid rate limit header from Discord: {e}")
+            return False
 
 # ============================================================================
 # MAIN SCRIPT
 # ============================================================================
 
+def count_into(jobs, stats, key):
+    """Yield jobs unchanged while counting them into stats[key]"""
+    for job in jobs:
+        stats[key] += 1
+        yield job
+
 def main():
     """Main function - scrape, filter, and send jobs with improved logic"""
     
-    print("\n" + "="*60)
-    print("🔍 Job Scraper Starting...")
-    print(f"⏰ Looking for jobs posted in the last {JOB_FRESHNESS_HOURS} hours")
-    print("="*60 + "\n")
+    log("\n" + "="*60)
+    log("🔍 Job Scraper Starting...")
+    log(f"⏰ Looking for jobs posted in the last {JOB_FRESHNESS_HOURS} hours")
+    log("="*60 + "\n")
     
     # Validate configuration
     if not WEBHOOK_URL:
-        print("❌ JOB_WEBHOOK_URL environment variable not set!")
+        log("❌ JOB_WEBHOOK_URL environment variable not set!")
         return
     
-    # Fetch jobs from RemoteOK
-    jobs = fetch_remoteok_jobs()
-    
-    if not jobs:
-        print("❌ No jobs fetched. Exiting.")
-        return
+    # Use one epoch timestamp for the whole run
+    now = time.time()
+    cutoff_epoch = get_cutoff_epoch(now)
     
     # Statistics tracking
     stats = {
-        'total_fetched': len(jobs),
+        'total_fetched': 0,
         'fresh_jobs': 0,
         'already_sent': 0,
+        'unseen_jobs': 0,
         'criteria_matched': 0,
         'successfully_sent': 0,
         'send_failed': 0
     }
     
-    # Filter and send matching jobs
-    for job in jobs:
-        job_id = job.get('id')
-        job_title = job.get('position', 'Unknown')
-        
-        # FIRST: Check if job is fresh (within time window)
-        if not is_job_fresh(job, JOB_FRESHNESS_HOURS):
-            continue
-        stats['fresh_jobs'] += 1
-        
-        # SECOND: Skip if we've already sent this job
-        if is_already_sent(job_id):
-            stats['already_sent'] += 1
-            continue
-        
-        # THIRD: Check if job matches your criteria
-        if not matches_criteria(job):
-            continue
-        stats['criteria_matched'] += 1
-        
-        # FOURTH: Send to Discord
-        print(f"📤 Processing: {job_title}")
-        if send_to_discord(job):
-            save_sent_job(job_id)
-            stats['successfully_sent'] += 1
+    # Stream jobs from RemoteOK
+    feed = fetch_remoteok_jobs()
+    jobs = count_into(feed, stats, 'total_fetched')
+    
+    # Filter lazily so nothing past the send limit is ever checked:
+    # FIRST: fresh (within time window), SECOND: not already sent,
+    # THIRD: matches your criteria (title, then tags/company, then description)
+    fresh = count_into(
+        (job for job in jobs if is_job_fresh(job, cutoff_epoch)), stats, 'fresh_jobs')
+    unseen = count_into(
+        (job for job in fresh if not is_already_sent(job.get('id'))), stats, 'unseen_jobs')
+    candidates = (normalize_job(job) for job in unseen)
+    matched = count_into(
+        (job for job in candidates if matches_criteria(job)), stats, 'criteria_matched')
+    
+    # FOURTH: Queue for Discord - stop after MAX_JOBS_PER_RUN jobs per run
+    matched_jobs = []
+    for job in islice(matched, MAX_JOBS_PER_RUN):
+        log(f"📤 Processing: {job.raw.get('position', 'Unknown')}")
+        matched_jobs.append(job)
+    
+    feed.close()  # Stop reading the feed once we have enough jobs
+    
+    if stats['total_fetched'] == 0:
+        log("❌ No jobs fetched. Exiting.")
+        return
+    
+    if len(matched_jobs) >= MAX_JOBS_PER_RUN:
+        log(f"\n⚠️ Reached {len(matched_jobs)} jobs limit for this run")
+    stats['already_sent'] = stats['fresh_jobs'] - stats['unseen_jobs']
+    
+    # Send queued jobs in as few webhook messages as possible
+    for i in range(0, len(matched_jobs), DISCORD_MAX_EMBEDS):
+        batch = matched_jobs[i:i + DISCORD_MAX_EMBEDS]
+        if send_embeds([build_embed(job.raw, now) for job in batch]):
+            for job in batch:
+                save_sent_job(job.id)
+                log(f"✅ Sent to Discord: {job.raw.get('position', 'Unknown')} at {job.raw.get('company', 'Unknown')}")
+            stats['successfully_sent'] += len(batch)
         else:
-            stats['send_failed'] += 1
-        
-        # Rate limiting - stop after sending 5 jobs per run
-        if stats['successfully_sent'] >= 5:
-            print(f"\n⚠️ Reached {stats['successfully_sent']} jobs limit for this run")
-            break
+            stats['send_failed'] += len(batch)
+    
+    # Persist sent job IDs once for the whole run
+    flush_sent_jobs()
+    
+    # Skip this feed version next time only if nothing is left to retry
+    if stats['send_failed'] == 0:
+        save_feed_validators()
     
     # Print comprehensive statistics
-    print(f"\n📊 Run Statistics:")
-    print(f"   • Total jobs fetched: {stats['total_fetched']}")
-    print(f"   • Fresh jobs (last {JOB_FRESHNESS_HOURS}h): {stats['fresh_jobs']}")
-    print(f"   • Already sent (skipped): {stats['already_sent']}")
-    print(f"   • Matched criteria: {stats['criteria_matched']}")
-    print(f"   • Successfully sent: {stats['successfully_sent']}")
+    log(f"\n📊 Run Statistics:")
+    log(f"   • Jobs read from RemoteOK: {stats['total_fetched']}")
+    log(f"   • Fresh jobs (last {JOB_FRESHNESS_HOURS}h): {stats['fresh_jobs']}")
+    log(f"   • Already sent (skipped): {stats['already_sent']}")
+    log(f"   • Matched criteria: {stats['criteria_matched']}")
+    log(f"   • Successfully sent: {stats['successfully_sent']}")
     if stats['send_failed'] > 0:
-        print(f"   • Failed to send: {stats['send_failed']}")
+        log(f"   • Failed to send: {stats['send_failed']}")
     
-    print(f"\n✅ Complete! Sent {stats['successfully_sent']} new job(s) to Discord")
-    print("="*60 + "\n")
+    log(f"\n✅ Complete! Sent {stats['successfully_sent']} new job(s) to Discord")
+    log("="*60 + "\n")
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    finally:
+        flush_log()  # Runs even if the scraper crashes, so no log lines are lost